@@ -57,9 +57,11 @@ class PermitSeriesViewSet(CreateAndReadOnlyModelViewSet):
 
             to_deactivate.update(active=False)
 
-            PermitSeries.delete_prunable_series()
+        # Prune outside of the activation transaction, so that each
+        # chunk of pruned series is committed and unlocked separately
+        PermitSeries.delete_prunable_series()
 
-            return Response({'status': 'OK'})
+        return Response({'status': 'OK'})
 
 
 class PermitListSerializer(serializers.ListSerializer):
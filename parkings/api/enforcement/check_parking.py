@@ -144,7 +144,8 @@ def check_parking(registration_number, zone, area, time, domain):
         Parking.objects
         .registration_number_like(registration_number)
         .valid_at(time)
-        .only("id", "zone", "time_end")
+        .select_related("zone")
+        .only("id", "time_end", "zone", "zone__number")
         .filter(domain=domain))
     for parking in active_parkings:
         if zone is None or parking.zone.number <= zone:
@@ -97,7 +97,10 @@ class ValidParkingFilter(django_filters.rest_framework.FilterSet):
 
 class ValidParkingViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsEnforcer]
-    queryset = Parking.objects.order_by('-time_end')
+    queryset = (
+        Parking.objects
+        .order_by('-time_end')
+        .select_related('operator', 'zone'))
     serializer_class = ValidParkingSerializer
     filterset_class = ValidParkingFilter
 
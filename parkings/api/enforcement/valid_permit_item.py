@@ -46,7 +46,10 @@ class ValidPermitItemFilter(django_filters.rest_framework.FilterSet):
 
 class ValidPermitItemViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsEnforcer]
-    queryset = PermitLookupItem.objects.active()
+    queryset = (
+        PermitLookupItem.objects
+        .active()
+        .select_related('permit__series__owner__operator', 'area'))
     serializer_class = ValidPermitItemSerializer
     filterset_class = ValidPermitItemFilter
     pagination_class = CursorPagination
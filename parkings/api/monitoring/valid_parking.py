@@ -31,7 +31,7 @@ class ValidParkingViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = (
         Parking.objects
         .order_by('time_start')
-        .select_related('operator'))
+        .select_related('operator', 'zone'))
     serializer_class = ParkingSerializer
     pagination_class = gis_pagination.GeoJsonPagination
     filterset_class = ValidParkingFilter
@@ -23,5 +23,5 @@ class Command(BaseCommand):
             if choice != "yes":
                 return
 
-        parkings_to_archive.archive()
-        self.stdout.write("Archived %s parkings." % parkings_to_archive.count())
+        archived_count = parkings_to_archive.archive()
+        self.stdout.write("Archived %s parkings." % archived_count)
@@ -30,7 +30,9 @@ class Command(BaseCommand):
 
         reset_sanitizing_session()  # Make sure the secret is new when starting the sanitizing
 
-        for parking in parkings_to_sanitize:
+        sanitized_count = 0
+        for parking in parkings_to_sanitize.iterator(chunk_size=2000):
             parking.sanitize()
+            sanitized_count += 1
 
-        self.stdout.write("Sanitized %s parkings." % parkings_to_sanitize.count())
+        self.stdout.write("Sanitized %s parkings." % sanitized_count)
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.15 on 2026-10-15 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parkings', '0040_alter_parkingterminal_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='permitseries',
+            index=models.Index(condition=models.Q(active=True), fields=['owner', '-modified_at'], name='permitseries_active_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.15 on 2026-10-15 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parkings', '0041_permitseries_active_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parking',
+            index=models.Index(fields=['time_start', 'time_end'], name='parkings_pa_time_st_9e4b5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedparking',
+            index=models.Index(fields=['time_start'], name='parkings_ar_time_st_6e5ad1_idx'),
+        ),
+        migrations.AlterField(
+            model_name='parking',
+            name='time_start',
+            field=models.DateTimeField(verbose_name='parking start time'),
+        ),
+        migrations.AlterField(
+            model_name='archivedparking',
+            name='time_start',
+            field=models.DateTimeField(verbose_name='parking start time'),
+        ),
+    ]
@@ -6,8 +6,11 @@ from django.utils.translation import ugettext_lazy as _
 
 class AnonymizeQuerySetMixin(models.QuerySet):
     def anonymize(self):
-        for item in self:
+        count = 0
+        for item in self.iterator(chunk_size=2000):
             item.anonymize()
+            count += 1
+        return count
 
 
 class UnanonymizedQuerySetMixin(models.QuerySet):
@@ -39,8 +39,11 @@ class ParkingQuerySet(AnonymizeQuerySetMixin, UnanonymizedQuerySetMixin, models.
         return self.exclude(time_end=None).filter(time_end__lte=time)
 
     def archive(self):
-        for parking in self:
+        count = 0
+        for parking in self.iterator(chunk_size=2000):
             parking.archive()
+            count += 1
+        return count
 
     def registration_number_like(self, registration_number):
         """
@@ -84,7 +87,7 @@ class AbstractParking(TimestampedModelMixin, UUIDPrimaryKeyMixin):
         verbose_name=_("normalized registration number"),
     )
     time_start = models.DateTimeField(
-        verbose_name=_("parking start time"), db_index=True,
+        verbose_name=_("parking start time"),
     )
     time_end = models.DateTimeField(
         verbose_name=_("parking end time"), db_index=True, null=True, blank=True,
@@ -123,6 +126,9 @@ class AbstractParking(TimestampedModelMixin, UUIDPrimaryKeyMixin):
 
 class Parking(AbstractParking):
     class Meta:
+        indexes = [
+            models.Index(fields=['time_start', 'time_end']),
+        ]
         verbose_name = _("parking")
         verbose_name_plural = _("parkings")
         default_related_name = "parkings"
@@ -203,6 +209,9 @@ class ArchivedParking(AbstractParking):
     sanitized_at = models.DateTimeField(verbose_name=_("time sanitized"), null=True, blank=True)
 
     class Meta:
+        indexes = [
+            models.Index(fields=['time_start']),
+        ]
         verbose_name = _("archived parking")
         verbose_name_plural = _("archived parkings")
         default_related_name = "archived_parkings"
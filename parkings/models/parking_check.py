@@ -75,8 +75,7 @@ class ParkingCheck(models.Model):
 
 def _format_coordinates(location, prec=5):
     assert location.srid == WGS84_SRID
-    longitude = location.coords[0]
-    latitude = location.coords[1]
+    (longitude, latitude) = location.coords[:2]
     e_or_w = "E" if longitude >= 0.0 else "W"
     n_or_s = "N" if latitude >= 0.0 else "S"
     return "{latitude:.{prec}f}{n_or_s} {longitude:.{prec}f}{e_or_w}".format(
@@ -1,9 +1,12 @@
+from collections import defaultdict
 from itertools import chain
 
 from django.conf import settings
 from django.contrib.gis.db import models as gis_models
 from django.db import models, router, transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.translation import gettext_lazy as _
 
 from ..fields import CleaningJsonField
@@ -13,6 +16,8 @@ from .enforcement_domain import EnforcementDomain
 from .mixins import AnonymizeQuerySetMixin, TimestampedModelMixin, UnanonymizedQuerySetMixin
 from .parking import Parking
 
+LOOKUP_ITEM_BATCH_SIZE = 1000
+
 
 class PermitArea(TimestampedModelMixin):
     name = models.CharField(max_length=40, verbose_name=_('name'))
@@ -54,14 +59,41 @@ class PermitSeries(TimestampedModelMixin, models.Model):
 
     class Meta:
         ordering = ('created_at', 'id')
+        indexes = [
+            models.Index(
+                fields=['owner', '-modified_at'],
+                condition=models.Q(active=True),
+                name='permitseries_active_idx'),
+        ]
         verbose_name = _("permit series")
         verbose_name_plural = _("permit series")
 
     @classmethod
-    def delete_prunable_series(cls, time_limit=None):
-        prunable = cls.objects.prunable(time_limit)
-        Permit.objects.filter(series__in=prunable).delete()
-        prunable.delete()
+    def delete_prunable_series(cls, time_limit=None, chunk_size=500):
+        """
+        Delete prunable series and their permits in chunks.
+
+        When called outside of a transaction, each chunk of series is
+        deleted and committed in its own transaction, so that pruning
+        many series doesn't keep them all locked until the end.  The
+        permits of a single series are still deleted in one go.
+
+        The series of each chunk are locked and checked to still be
+        prunable before deleting, so a series which was activated after
+        the prunable series were listed is kept.
+        """
+        limit = time_limit or (
+            timezone.now() - settings.PARKKIHUBI_PERMITS_PRUNABLE_AFTER)
+        prunable_ids = list(
+            cls.objects.prunable(limit).values_list('pk', flat=True))
+        for start in range(0, len(prunable_ids), chunk_size):
+            chunk = prunable_ids[start:(start + chunk_size)]
+            with transaction.atomic():
+                series_ids = list(
+                    cls.objects.prunable(limit).filter(pk__in=chunk)
+                    .select_for_update().values_list('pk', flat=True))
+                Permit.objects.filter(series__in=series_ids).delete()
+                cls.objects.filter(pk__in=series_ids).delete()
 
     def __str__(self):
         return str(self.id)
@@ -73,15 +105,28 @@ class PermitQuerySet(models.QuerySet):
 
     def by_time(self, timestamp):
         lookup_items = PermitLookupItem.objects.by_time(timestamp)
-        return self.filter(lookup_items__in=lookup_items).distinct()
+        return self._having_lookup_items(lookup_items, 'time')
 
     def by_subject(self, registration_number):
         lookup_items = PermitLookupItem.objects.by_subject(registration_number)
-        return self.filter(lookup_items__in=lookup_items).distinct()
+        return self._having_lookup_items(lookup_items, 'subject')
 
     def by_area(self, area):
         lookup_items = PermitLookupItem.objects.by_area(area)
-        return self.filter(lookup_items__in=lookup_items).distinct()
+        return self._having_lookup_items(lookup_items, 'area')
+
+    def _having_lookup_items(self, lookup_items, name):
+        """
+        Filter to permits having any of the given lookup items.
+
+        Uses an EXISTS subquery rather than a join, so that permits with
+        several matching lookup items are not duplicated and no DISTINCT
+        is needed.
+        """
+        annotation = '_has_lookup_item_by_' + name
+        matching_items = lookup_items.filter(permit=OuterRef('pk'))
+        return self.annotate(**{annotation: Exists(matching_items)}).filter(
+            **{annotation: True})
 
     def bulk_create(self, permits, *args, **kwargs):
         for permit in permits:
@@ -90,8 +135,11 @@ class PermitQuerySet(models.QuerySet):
 
         with transaction.atomic(using=self.db, savepoint=False):
             created_permits = super().bulk_create(permits, *args, **kwargs)
+            permit_areas = _get_permit_areas(created_permits)
             PermitLookupItem.objects.using(self.db).bulk_create(
-                chain(*(x._make_lookup_items() for x in created_permits)))
+                chain(*(x._make_lookup_items(permit_areas)
+                        for x in created_permits)),
+                batch_size=LOOKUP_ITEM_BATCH_SIZE)
             return created_permits
 
 
@@ -132,30 +180,103 @@ class Permit(TimestampedModelMixin, models.Model):
     def save(self, using=None, *args, **kwargs):
         self.full_clean()
         using = using or router.db_for_write(type(self), instance=self)
+        had_pk = self.pk is not None
         with transaction.atomic(using=using, savepoint=False):
             super(Permit, self).save(using=using, *args, **kwargs)
-            self.lookup_items.all().using(using).delete()
-            new_lookup_items = self._make_lookup_items()
-            PermitLookupItem.objects.using(using).bulk_create(new_lookup_items)
+            if not had_pk:
+                new_lookup_items = self._make_lookup_items()
+            else:
+                new_lookup_items = self._update_lookup_items(using)
+            PermitLookupItem.objects.using(using).bulk_create(
+                new_lookup_items, batch_size=LOOKUP_ITEM_BATCH_SIZE)
+
+    def _update_lookup_items(self, using):
+        """
+        Delete outdated lookup items and return the missing ones.
+
+        Lookup items which are still up to date are left untouched, so
+        that a small change to the subjects or areas doesn't rewrite all
+        lookup items of the permit.
+
+        :rtype: list[PermitLookupItem]
+        """
+        existing_ids = defaultdict(list)
+        existing_items = self.lookup_items.all().using(using).values_list(
+            'id', 'registration_number', 'area', 'start_time', 'end_time')
+        for (item_id, reg_num, area_id, start_time, end_time) in existing_items:
+            existing_ids[(reg_num, area_id, start_time, end_time)].append(
+                item_id)
+
+        missing_items = []
+        for item in self._make_lookup_items():
+            key = (
+                item.registration_number, item.area_id,
+                parse_datetime(item.start_time), parse_datetime(item.end_time))
+            if existing_ids.get(key):
+                existing_ids[key].pop()
+            else:
+                missing_items.append(item)
+
+        outdated_ids = list(chain(*existing_ids.values()))
+        if outdated_ids:
+            PermitLookupItem.objects.using(using).filter(
+                id__in=outdated_ids).delete()
+        return missing_items
+
+    def _make_lookup_items(self, permit_areas=None):
+        """
+        Make lookup items for the intersections of subjects and areas.
+
+        :param permit_areas:
+          Permit areas by domain id and identifier, as returned by
+          _get_permit_areas.  Queried for this permit if not given.
+        :type permit_areas: dict[(int, str), PermitArea]|None
+        """
+        if permit_areas is None:
+            permit_areas = _get_permit_areas([self])
+
+        subjects = [
+            (subject['start_time'], subject['end_time'],
+             Parking.normalize_reg_num(subject['registration_number']))
+            for subject in self.subjects]
 
-    def _make_lookup_items(self):
         for area in self.areas:
-            for subject in self.subjects:
-                max_start_time = max(subject['start_time'], area['start_time'])
-                min_end_time = min(subject['end_time'], area['end_time'])
+            permit_area = permit_areas.get((self.domain_id, area['area']))
+            for (subject_start, subject_end, registration_number) in subjects:
+                max_start_time = max(subject_start, area['start_time'])
+                min_end_time = min(subject_end, area['end_time'])
 
                 if max_start_time >= min_end_time:
                     continue
+                if permit_area is None:
+                    raise PermitArea.DoesNotExist(
+                        'Unknown permit area: {}'.format(area['area']))
                 yield PermitLookupItem(
                     permit=self,
-                    registration_number=Parking.normalize_reg_num(
-                        subject['registration_number']),
-                    area=PermitArea.objects.get(identifier=area['area'], domain=self.domain),
+                    registration_number=registration_number,
+                    area=permit_area,
                     start_time=max_start_time,
                     end_time=min_end_time
                 )
 
 
+def _get_permit_areas(permits):
+    """
+    Get the permit areas referred by the given permits with one query.
+
+    :type permits: list[Permit]
+    :rtype: dict[(int, str), PermitArea]
+    """
+    domain_ids = {permit.domain_id for permit in permits}
+    identifiers = {
+        area['area'] for permit in permits for area in permit.areas}
+    if not identifiers:
+        return {}
+    permit_areas = PermitArea.objects.filter(
+        domain__in=domain_ids, identifier__in=identifiers)
+    return {(x.domain_id, x.identifier): x for x in permit_areas}
+
+
 class PermitLookupItemQuerySet(AnonymizeQuerySetMixin, UnanonymizedQuerySetMixin, models.QuerySet):
     def active(self):
         return self.filter(permit__series__active=True)
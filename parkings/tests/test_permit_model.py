@@ -1,11 +1,15 @@
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from ..factories.permit import (
     create_permit, create_permit_series, generate_areas, generate_external_ids,
     generate_subjects)
-from ..models import EnforcementDomain, Permit, PermitArea, PermitLookupItem
+from ..models import (
+    EnforcementDomain, Permit, PermitArea, PermitLookupItem, PermitSeries)
+from ..models.permit import PermitSeriesQuerySet
 
 
 @pytest.mark.django_db
@@ -124,3 +128,120 @@ def test_permitlookupitem_creation_ignored_for_start_date_gte_end_date():
 
     assert Permit.objects.count() == 1
     assert PermitLookupItem.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_permit_bulk_create_makes_lookup_items():
+    domain = EnforcementDomain.get_default_domain()
+    series = create_permit_series()
+    permits = [
+        Permit(
+            domain=domain,
+            series=series,
+            external_id=generate_external_ids(),
+            subjects=generate_subjects(count=2),
+            areas=generate_areas(domain=domain, count=3),
+        )
+        for _ in range(2)
+    ]
+
+    created_permits = Permit.objects.bulk_create(permits)
+
+    for permit in created_permits:
+        lookup_items = PermitLookupItem.objects.filter(permit=permit)
+        assert lookup_items.count() == 6
+        assert (
+            set(lookup_items.values_list('area__identifier', flat=True)) ==
+            set(area['area'] for area in permit.areas))
+
+
+@pytest.mark.django_db
+def test_permit_save_keeps_unchanged_lookup_items():
+    permit = create_permit(subject_count=1, area_count=1)
+    old_item_ids = set(permit.lookup_items.values_list('id', flat=True))
+
+    permit.subjects = permit.subjects + generate_subjects(count=1)
+    permit.save()
+
+    new_item_ids = set(permit.lookup_items.values_list('id', flat=True))
+    assert len(new_item_ids) == 2
+    assert old_item_ids < new_item_ids
+
+
+@pytest.mark.django_db
+def test_permit_save_removes_outdated_lookup_items():
+    permit = create_permit(subject_count=2, area_count=1)
+    kept_reg_num = permit.lookup_items.first().registration_number
+
+    permit.subjects = [
+        subject for subject in permit.subjects
+        if subject['registration_number'].replace('-', '') == kept_reg_num]
+    permit.save()
+
+    assert list(permit.lookup_items.values_list(
+        'registration_number', flat=True)) == [kept_reg_num]
+
+
+@pytest.mark.django_db
+def test_permit_save_updates_lookup_item_with_changed_times():
+    permit = create_permit(subject_count=1, area_count=1)
+    old_item = permit.lookup_items.get()
+    new_end_time = old_item.end_time - timezone.timedelta(minutes=30)
+
+    permit.subjects = [
+        dict(permit.subjects[0], end_time=new_end_time.isoformat())]
+    permit.save()
+
+    new_item = permit.lookup_items.get()
+    assert new_item.id != old_item.id
+    assert new_item.registration_number == old_item.registration_number
+    assert new_item.start_time == old_item.start_time
+    assert new_item.end_time == new_end_time
+
+
+@pytest.mark.django_db
+def test_delete_prunable_series_in_chunks():
+    old_series = [create_permit(active=False).series for _ in range(3)]
+    PermitSeries.objects.filter(pk__in=[x.pk for x in old_series]).update(
+        created_at=timezone.now() - timezone.timedelta(days=30))
+    kept_permit = create_permit(active=False)
+
+    with CaptureQueriesContext(connection) as context:
+        PermitSeries.delete_prunable_series(
+            time_limit=timezone.now() - timezone.timedelta(days=1),
+            chunk_size=2)
+
+    series_deletes = [
+        query for query in context.captured_queries
+        if query['sql'].startswith('DELETE FROM "parkings_permitseries"')]
+    assert len(series_deletes) == 2
+    assert list(PermitSeries.objects.all()) == [kept_permit.series]
+    assert list(Permit.objects.all()) == [kept_permit]
+    assert PermitLookupItem.objects.exclude(permit=kept_permit).count() == 0
+
+
+@pytest.mark.django_db
+def test_delete_prunable_series_keeps_series_activated_meanwhile(monkeypatch):
+    permit = create_permit(active=False)
+    series = permit.series
+    PermitSeries.objects.filter(pk=series.pk).update(
+        created_at=timezone.now() - timezone.timedelta(days=30))
+
+    original_prunable = PermitSeriesQuerySet.prunable
+    prunable_calls = []
+
+    def prunable(self, time_limit=None):
+        if prunable_calls:
+            # Activate the series after the prunable ids were listed
+            PermitSeries.objects.filter(pk=series.pk).update(active=True)
+        prunable_calls.append(time_limit)
+        return original_prunable(self, time_limit)
+
+    monkeypatch.setattr(PermitSeriesQuerySet, 'prunable', prunable)
+
+    PermitSeries.delete_prunable_series(
+        time_limit=timezone.now() - timezone.timedelta(days=1))
+
+    assert len(prunable_calls) == 2
+    assert list(PermitSeries.objects.all()) == [series]
+    assert list(Permit.objects.all()) == [permit]
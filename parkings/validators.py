@@ -61,6 +61,7 @@ class DictListValidator:
         assert all(isinstance(x, str) for x in item_schema.keys())
         assert all(isinstance(x, Field) for x in item_schema.values())
         self.item_schema = item_schema
+        self._schema_fields = frozenset(item_schema.keys())
 
     def __call__(self, value):
         self.clean(value)
@@ -76,7 +77,7 @@ class DictListValidator:
                 _('Each list item must be a dictionary'),
                 code='invalid-item-type')
 
-        extra_fields = set(item.keys()) - set(self.item_schema.keys())
+        extra_fields = item.keys() - self._schema_fields
 
         if extra_fields:
             raise ValidationError(